@@ -2,10 +2,18 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import numpy as np
+import hashlib
+import os
+import re
+import shutil
+import time
 from datetime import datetime, timedelta
+from functools import reduce
 from typing import Dict, List, Optional
 import plotly.graph_objects as go
 import plotly.express as px
+from tenacity import Retrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from yfinance.exceptions import YFException
 
 # 페이지 설정
 st.set_page_config(
@@ -15,8 +23,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CSS 스타일링
-st.markdown("""
+# CSS 스타일링 (공백을 정리해 한 줄로 전송)
+_CSS = re.sub(r"\s*\n\s*", "", """
 <style>
     .main-header {
         font-size: 2.8rem;
@@ -82,7 +90,25 @@ st.markdown("""
         margin: 10px 0;
     }
 </style>
-""", unsafe_allow_html=True)
+""")
+
+# 카드 HTML 템플릿
+_METAL_CARD_HTML = re.sub(r"\s*\n\s*", "", """
+<div class="{sig_class}">
+    <div style="font-size: 1.3rem;">{name}</div>
+    <div style="font-size: 1.1rem; margin: 0.5rem 0;">{signal}</div>
+    <div style="font-size: 0.85rem;">{description}</div>
+</div>
+""")
+
+_RATIO_CARD_HTML = re.sub(r"\s*\n\s*", "", """
+<div class="signal-neutral">
+    <h4>{title}</h4>
+    <div style="font-size: 2rem;">{ratio}</div>
+    <div>{signal}</div>
+    <div style="font-size: 0.85rem; margin-top: 1rem;">{description}</div>
+</div>
+""")
 
 # ETF 티커 맵핑
 METAL_ETFS = {
@@ -117,60 +143,174 @@ SUPPORTING_INDICES = {
     'vix': {'symbol': '^VIX', 'name': 'VIX'}
 }
 
+# 디스크 캐시 (프로세스 재시작/캐시 초기화 후에도 유지)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+CACHE_TTL = 300
+
+# 차트 한 개 트레이스당 최대 포인트 수 (차트 픽셀 폭 수준, 초과 시 MinMaxLTTB 다운샘플링)
+MAX_CHART_POINTS = 1500
+
+# ============================================================================
+# 디스크 캐시 함수
+# ============================================================================
+
+def _cache_path(endpoint, key, day=None):
+    """캐시 파일 경로: .cache/<날짜>/<엔드포인트>/<키>.pkl"""
+    day = day or datetime.now().strftime('%Y-%m-%d')
+    return os.path.join(CACHE_DIR, day, endpoint, f"{key}.pkl")
+
+def _cache_load(endpoint, key):
+    """TTL 이내의 캐시된 DataFrame 반환 (없으면 None)"""
+    path = _cache_path(endpoint, key)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL:
+            return None
+        return pd.read_pickle(path)
+    except Exception:
+        return None
+
+def _cache_save(endpoint, key, df):
+    """DataFrame을 오늘 파티션에 저장하고 지난 날짜 파티션 정리"""
+    path = _cache_path(endpoint, key)
+    today = os.path.basename(os.path.dirname(os.path.dirname(path)))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_pickle(path)
+        for day in os.listdir(CACHE_DIR):
+            if day != today:
+                shutil.rmtree(os.path.join(CACHE_DIR, day), ignore_errors=True)
+    except OSError:
+        pass
+
+def clear_today_cache():
+    """오늘 날짜 캐시 파티션만 삭제"""
+    shutil.rmtree(os.path.join(CACHE_DIR, datetime.now().strftime('%Y-%m-%d')), ignore_errors=True)
+
+class IncompleteDownloadError(Exception):
+    """일부 티커 데이터가 비어 있는 다운로드 (부분 결과 포함)"""
+    
+    def __init__(self, df, missing):
+        super().__init__(f"데이터 없음: {', '.join(missing)}")
+        self.df = df
+        self.missing = missing
+
+def _merge_frames(frames):
+    """시도별 부분 다운로드를 날짜 인덱스 기준으로 병합"""
+    return pd.concat(frames, axis=1).sort_index() if frames else pd.DataFrame()
+
+def _download(symbols, **kwargs):
+    """yf.download 일괄 호출 - 누락 티커만 지수 백오프로 재요청해 병합"""
+    frames, pending = [], list(symbols)
+    for attempt in Retrying(stop=stop_after_attempt(3), wait=wait_exponential_jitter(1, 8),
+                            retry=retry_if_exception_type(IncompleteDownloadError), reraise=True):
+        with attempt:
+            # session은 넘기지 않음: yfinance가 프로세스 전역 curl_cffi 세션(쿠키/crumb 포함)을 유지
+            df = yf.download(pending, group_by='ticker', threads=True, progress=False,
+                             auto_adjust=True, **kwargs)
+            loaded = [sym for sym in pending if not _split_download(df, sym).empty]
+            if loaded:
+                frames.append(df[loaded])
+            pending = [sym for sym in pending if sym not in loaded]
+            if pending:
+                raise IncompleteDownloadError(_merge_frames(frames), pending)
+    return _merge_frames(frames)
+
+def _cached_download(endpoint, key, symbols, **kwargs):
+    """디스크 캐시를 거치는 yf.download (부분 실패 결과는 캐시하지 않음)"""
+    cache_key = f"{'_'.join(symbols)}_{key}".replace('^', '').replace('=', '')
+    df = _cache_load(endpoint, cache_key)
+    if df is not None:
+        return df
+    
+    try:
+        df = _download(symbols, **kwargs)
+    except IncompleteDownloadError as e:
+        return e.df
+    
+    _cache_save(endpoint, cache_key, df)
+    return df
+
 # ============================================================================
 # 데이터 수집 함수
 # ============================================================================
 
+def _split_download(df, symbol):
+    """일괄 다운로드 결과에서 단일 티커 히스토리 추출"""
+    if df is None or df.empty or symbol not in df.columns.get_level_values(0):
+        return pd.DataFrame()
+    return df[symbol].dropna(how='all')
+
+def _last_two_closes(df, symbols):
+    """티커별 마지막 두 유효 종가와 유효 개수 (거래일 차이로 생기는 NaN 제외, 1개뿐이면 prev = current)"""
+    closes = df.xs('Close', level=1, axis=1).reindex(columns=symbols).to_numpy(dtype=np.float64)
+    valid = ~np.isnan(closes)
+    rank = np.cumsum(valid, axis=0)
+    count = rank[-1]
+    current = np.where(valid & (rank == count), closes, 0).sum(axis=0)
+    prev = np.where(valid & (rank == count - 1), closes, 0).sum(axis=0)
+    prev = np.where(count >= 2, prev, current)
+    return current, prev, count
+
+@st.cache_data(ttl=300)
+def fetch_market_data(lookback_days=365):
+    """ETF, 선물, 보조 지표 전체를 한 번의 일괄 요청으로 수집"""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=lookback_days)
+    
+    # 모든 티커를 한 번에 요청 (yfinance 내부 스레드풀로 병렬 처리)
+    symbols = ([info['symbol'] for info in METAL_ETFS.values()]
+               + [info['futures'] for info in METAL_ETFS.values()]
+               + [info['symbol'] for info in SUPPORTING_INDICES.values()])
+    return _cached_download('market', f"{lookback_days}d", symbols,
+                            start=start_date, end=end_date)
+
 @st.cache_data(ttl=300)
 def fetch_etf_data(lookback_days=365):
     """ETF 및 선물 데이터 수집"""
     data = {}
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=lookback_days)
     
-    for key, info in METAL_ETFS.items():
-        try:
-            # ETF 데이터
-            etf = yf.Ticker(info['symbol'])
-            etf_hist = etf.history(start=start_date, end=end_date)
-            
-            # 선물 데이터
-            futures = yf.Ticker(info['futures'])
-            futures_hist = futures.history(period="5d")
-            
-            if not etf_hist.empty and not futures_hist.empty:
-                data[key] = {
-                    'etf_history': etf_hist,
-                    'futures_current': futures_hist['Close'].iloc[-1],
-                    'futures_prev': futures_hist['Close'].iloc[-2] if len(futures_hist) >= 2 else futures_hist['Close'].iloc[-1],
-                    'etf_current': etf_hist['Close'].iloc[-1],
-                    'etf_prev': etf_hist['Close'].iloc[-2] if len(etf_hist) >= 2 else etf_hist['Close'].iloc[-1],
-                    'info': info
-                }
-        except Exception as e:
-            st.warning(f"{info['name']} 데이터 로드 실패: {str(e)}")
+    df = fetch_market_data(lookback_days)
+    if df is None or df.empty:
+        return data
+    
+    # 선물은 현재가/전일가만 필요하므로 히스토리를 잘라내지 않고 종가 단면에서 바로 추출
+    futures_current, futures_prev, futures_count = _last_two_closes(
+        df, [info['futures'] for info in METAL_ETFS.values()])
+    
+    for i, (key, info) in enumerate(METAL_ETFS.items()):
+        etf_hist = _split_download(df, info['symbol'])
+        
+        if etf_hist.empty or futures_count[i] == 0:
             continue
+        
+        etf_close = etf_hist['Close'].to_numpy()
+        
+        data[key] = {
+            'etf_history': etf_hist,
+            'futures_history': _split_download(df, info['futures']),
+            'futures_current': futures_current[i],
+            'futures_prev': futures_prev[i],
+            'etf_current': etf_close[-1],
+            'etf_prev': etf_close[max(len(etf_close) - 2, 0)],
+            'info': info
+        }
     
     return data
 
 @st.cache_data(ttl=300)
-def fetch_supporting_data():
-    """보조 지표 데이터 수집"""
-    data = {}
+def fetch_supporting_data(lookback_days=365):
+    """보조 지표 데이터 수집 (index: 지표 키, columns: current/prev/change_pct)"""
+    data = pd.DataFrame(columns=['current', 'prev', 'change_pct'], dtype=float)
     
-    for key, info in SUPPORTING_INDICES.items():
-        try:
-            ticker = yf.Ticker(info['symbol'])
-            hist = ticker.history(period="5d")
-            
-            if not hist.empty:
-                data[key] = {
-                    'current': hist['Close'].iloc[-1],
-                    'prev': hist['Close'].iloc[-2] if len(hist) >= 2 else hist['Close'].iloc[-1],
-                    'change_pct': ((hist['Close'].iloc[-1] - hist['Close'].iloc[-2]) / hist['Close'].iloc[-2] * 100) if len(hist) >= 2 else 0
-                }
-        except Exception as e:
-            continue
+    symbols = [info['symbol'] for info in SUPPORTING_INDICES.values()]
+    df = fetch_market_data(lookback_days)
+    if df is None or df.empty:
+        return data
+    
+    current, prev, count = _last_two_closes(df, symbols)
+    
+    data = pd.DataFrame({'current': current, 'prev': prev}, index=list(SUPPORTING_INDICES))[count > 0]
+    data['change_pct'] = np.where(count[count > 0] >= 2, (data['current'] - data['prev']) / data['prev'] * 100, 0.0)
     
     return data
 
@@ -178,58 +318,93 @@ def fetch_supporting_data():
 # 분석 함수
 # ============================================================================
 
+# 비율 신호 템플릿 (구간 경계: 미만은 아래 구간, "초과" 경계는 nextafter로 포함 처리)
+_GS_THRESHOLDS = np.array([60, 68, np.nextafter(82, np.inf), np.nextafter(90, np.inf)])
+_GS_BUCKETS = [
+    {
+        'signal': '🔴🔴 금 강력매수',
+        'level': 'strong_buy_gold',
+        'description_fmt': '금은비율 {ratio:.1f} - 금 심각한 저평가',
+        'action': '금 ETF 적극 매수, 은 ETF 일부 매도 고려',
+        'score': 5
+    },
+    {
+        'signal': '🔴 금 매수',
+        'level': 'buy_gold',
+        'description_fmt': '금은비율 {ratio:.1f} - 금 저평가',
+        'action': '금 ETF 매수 기회',
+        'score': 4
+    },
+    {
+        'signal': '🟡 중립',
+        'level': 'neutral',
+        'description_fmt': '금은비율 {ratio:.1f} - 정상 범위 (68-82)',
+        'action': '관망 또는 균형 유지',
+        'score': 3
+    },
+    {
+        'signal': '🟢 은 매수',
+        'level': 'buy_silver',
+        'description_fmt': '금은비율 {ratio:.1f} - 은 저평가',
+        'action': '은 ETF 매수 기회',
+        'score': 4
+    },
+    {
+        'signal': '🟢🟢 은 강력매수',
+        'level': 'strong_buy_silver',
+        'description_fmt': '금은비율 {ratio:.1f} - 은 심각한 저평가',
+        'action': '은 ETF 적극 매수, 금 ETF 일부 매도 고려',
+        'score': 5
+    }
+]
+_GS_NEUTRAL = 2
+
+_CG_THRESHOLDS = np.array([0.8, np.nextafter(1.5, np.inf)])
+_CG_BUCKETS = [
+    {
+        'signal': '🔴 경기 둔화',
+        'level': 'risk_off',
+        'description_fmt': '구리/금 비율 {ratio:.2f} - 리스크 오프, 경기 우려',
+        'action': '금 ETF 강세, 구리 ETF 약세 예상',
+        'score': 2
+    },
+    {
+        'signal': '🟡 균형',
+        'level': 'balanced',
+        'description_fmt': '구리/금 비율 {ratio:.2f} - 균형 상태',
+        'action': '혼재된 신호, 다른 지표 참고',
+        'score': 3
+    },
+    {
+        'signal': '🟢 경기 확장',
+        'level': 'risk_on',
+        'description_fmt': '구리/금 비율 {ratio:.2f} - 리스크 온, 경기 낙관',
+        'action': '구리 ETF 강세, 금 ETF 약세 예상',
+        'score': 4
+    }
+]
+_CG_NEUTRAL = 1
+
+def _bucket_signal(ratio, thresholds, buckets, neutral_idx):
+    """정렬된 경계값에서 구간을 찾아 템플릿으로 신호 생성"""
+    idx = int(np.searchsorted(thresholds, ratio, side='right')) if ratio == ratio else neutral_idx
+    tmpl = buckets[idx]
+    return {
+        'ratio': ratio,
+        'signal': tmpl['signal'],
+        'level': tmpl['level'],
+        'description': tmpl['description_fmt'].format(ratio=ratio),
+        'action': tmpl['action'],
+        'score': tmpl['score']
+    }
+
 def calculate_gold_silver_ratio(gold_price, silver_price):
     """금은비율 계산 및 5단계 신호 생성"""
     if silver_price == 0:
         return None
     
     ratio = gold_price / silver_price
-    
-    if ratio > 90:
-        return {
-            'ratio': ratio,
-            'signal': '🟢🟢 은 강력매수',
-            'level': 'strong_buy_silver',
-            'description': f'금은비율 {ratio:.1f} - 은 심각한 저평가',
-            'action': '은 ETF 적극 매수, 금 ETF 일부 매도 고려',
-            'score': 5
-        }
-    elif ratio > 82:
-        return {
-            'ratio': ratio,
-            'signal': '🟢 은 매수',
-            'level': 'buy_silver',
-            'description': f'금은비율 {ratio:.1f} - 은 저평가',
-            'action': '은 ETF 매수 기회',
-            'score': 4
-        }
-    elif ratio < 60:
-        return {
-            'ratio': ratio,
-            'signal': '🔴🔴 금 강력매수',
-            'level': 'strong_buy_gold',
-            'description': f'금은비율 {ratio:.1f} - 금 심각한 저평가',
-            'action': '금 ETF 적극 매수, 은 ETF 일부 매도 고려',
-            'score': 5
-        }
-    elif ratio < 68:
-        return {
-            'ratio': ratio,
-            'signal': '🔴 금 매수',
-            'level': 'buy_gold',
-            'description': f'금은비율 {ratio:.1f} - 금 저평가',
-            'action': '금 ETF 매수 기회',
-            'score': 4
-        }
-    else:
-        return {
-            'ratio': ratio,
-            'signal': '🟡 중립',
-            'level': 'neutral',
-            'description': f'금은비율 {ratio:.1f} - 정상 범위 (68-82)',
-            'action': '관망 또는 균형 유지',
-            'score': 3
-        }
+    return _bucket_signal(ratio, _GS_THRESHOLDS, _GS_BUCKETS, _GS_NEUTRAL)
 
 def calculate_copper_gold_ratio(copper_price, gold_price):
     """구리/금 비율 - 경기 심리 온도계"""
@@ -237,34 +412,13 @@ def calculate_copper_gold_ratio(copper_price, gold_price):
         return None
     
     ratio = (copper_price / gold_price) * 1000
-    
-    if ratio > 1.5:
-        return {
-            'ratio': ratio,
-            'signal': '🟢 경기 확장',
-            'level': 'risk_on',
-            'description': f'구리/금 비율 {ratio:.2f} - 리스크 온, 경기 낙관',
-            'action': '구리 ETF 강세, 금 ETF 약세 예상',
-            'score': 4
-        }
-    elif ratio < 0.8:
-        return {
-            'ratio': ratio,
-            'signal': '🔴 경기 둔화',
-            'level': 'risk_off',
-            'description': f'구리/금 비율 {ratio:.2f} - 리스크 오프, 경기 우려',
-            'action': '금 ETF 강세, 구리 ETF 약세 예상',
-            'score': 2
-        }
-    else:
-        return {
-            'ratio': ratio,
-            'signal': '🟡 균형',
-            'level': 'balanced',
-            'description': f'구리/금 비율 {ratio:.2f} - 균형 상태',
-            'action': '혼재된 신호, 다른 지표 참고',
-            'score': 3
-        }
+    return _bucket_signal(ratio, _CG_THRESHOLDS, _CG_BUCKETS, _CG_NEUTRAL)
+
+def _momentum_scores(pct: np.ndarray) -> np.ndarray:
+    """모멘텀 점수 (0~3) - pct 열: 전일, 1개월, 3개월, YTD 변동률(%)"""
+    return ((pct[:, 1] > 5).astype(np.int8)
+            + (pct[:, 2] > 10)
+            + (pct[:, 3] > 15))
 
 def generate_trading_signals(metal_data, supporting_data):
     """통합 신호 생성"""
@@ -292,23 +446,23 @@ def generate_trading_signals(metal_data, supporting_data):
             signals['copper_gold_ratio'] = cg_signal
     
     # 3. 개별 모멘텀
-    for key, data in metal_data.items():
-        etf_change = ((data['etf_current'] - data['etf_prev']) / data['etf_prev'] * 100)
-        
-        hist = data['etf_history']
-        month_ago_price = hist['Close'].iloc[-20] if len(hist) >= 20 else hist['Close'].iloc[0]
-        month_change = ((data['etf_current'] - month_ago_price) / month_ago_price * 100)
-        
-        quarter_ago_price = hist['Close'].iloc[-60] if len(hist) >= 60 else hist['Close'].iloc[0]
-        quarter_change = ((data['etf_current'] - quarter_ago_price) / quarter_ago_price * 100)
-        
-        ytd_price = hist['Close'].iloc[0]
-        ytd_change = ((data['etf_current'] - ytd_price) / ytd_price * 100)
-        
-        momentum_score = 0
-        if month_change > 5: momentum_score += 1
-        if quarter_change > 10: momentum_score += 1
-        if ytd_change > 15: momentum_score += 1
+    keys = list(metal_data)
+    pct = np.empty((len(keys), 4))
+    
+    for i, key in enumerate(keys):
+        # 전일 / 1개월(20일) / 3개월(60일) / 기간 시작 기준 가격을 한 번에 조회
+        close = metal_data[key]['etf_history']['Close'].to_numpy()
+        n = len(close)
+        anchors = np.maximum(n - np.array([2, 20, 60, n]), 0)
+        base = close[anchors]
+        pct[i] = (close[-1] - base) / base * 100
+    
+    momentum_scores = _momentum_scores(pct)
+    
+    for i, key in enumerate(keys):
+        data = metal_data[key]
+        etf_change, month_change, quarter_change, ytd_change = pct[i]
+        momentum_score = int(momentum_scores[i])
         
         if momentum_score >= 2 and etf_change > 0:
             signal_level = 'strong_buy' if momentum_score == 3 else 'buy'
@@ -344,9 +498,9 @@ def generate_trading_signals(metal_data, supporting_data):
     macro_score = 3
     macro_factors = []
     
-    if supporting_data:
-        if 'dxy' in supporting_data:
-            dxy_change = supporting_data['dxy']['change_pct']
+    if not supporting_data.empty:
+        if 'dxy' in supporting_data.index:
+            dxy_change = supporting_data.loc['dxy', 'change_pct']
             if dxy_change > 1:
                 macro_score -= 1
                 macro_factors.append(f"달러 강세 {dxy_change:+.2f}%")
@@ -354,15 +508,15 @@ def generate_trading_signals(metal_data, supporting_data):
                 macro_score += 1
                 macro_factors.append(f"달러 약세 {dxy_change:+.2f}%")
         
-        if 'vix' in supporting_data:
-            vix_level = supporting_data['vix']['current']
+        if 'vix' in supporting_data.index:
+            vix_level = supporting_data.loc['vix', 'current']
             if vix_level > 25:
                 macro_factors.append(f"VIX 높음 {vix_level:.1f}")
             elif vix_level < 15:
                 macro_factors.append(f"VIX 낮음 {vix_level:.1f}")
         
-        if 'spx' in supporting_data:
-            spx_change = supporting_data['spx']['change_pct']
+        if 'spx' in supporting_data.index:
+            spx_change = supporting_data.loc['spx', 'change_pct']
             if spx_change > 1:
                 macro_factors.append(f"주식 강세 {spx_change:+.2f}%")
             elif spx_change < -1:
@@ -377,106 +531,232 @@ def generate_trading_signals(metal_data, supporting_data):
     
     return signals
 
+@st.cache_data(ttl=300)
+def load_signals(lookback_days=365):
+    """조회 기간별 통합 신호 (표시 옵션 토글 시 재계산하지 않음)"""
+    return generate_trading_signals(fetch_etf_data(lookback_days), fetch_supporting_data(lookback_days))
+
 # ============================================================================
 # 차트 렌더링 함수
 # ============================================================================
 
+def _moving_averages(close: np.ndarray, windows=(20, 50)) -> tuple:
+    """단순 이동평균 여러 개를 누적합 한 번으로 계산 (앞쪽 w-1개 및 NaN 포함 구간은 NaN)"""
+    missing = np.isnan(close)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, close), dtype=np.float64)))
+    cnan = np.concatenate(([0], np.cumsum(missing)))
+    out = []
+    for w in windows:
+        ma = np.full(len(close), np.nan)
+        if len(close) >= w:
+            ma[w - 1:] = np.where(cnan[w:] - cnan[:-w] > 0, np.nan, (csum[w:] - csum[:-w]) / w)
+        out.append(ma)
+    return tuple(out)
+
+def _lttb(x, y, n_out):
+    """LTTB(Largest-Triangle-Three-Buckets) 다운샘플링 - 선택된 위치 반환 (x는 원본 위치)"""
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_x = x[hi:edges[i + 2]].mean()
+            avg_y = y[hi:edges[i + 2]].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    
+    return out
+
+def _downsample_indices(y, n_out=MAX_CHART_POINTS, minmax_ratio=4):
+    """MinMaxLTTB 다운샘플링 - 구간별 최소/최대값 사전 선택 후 LTTB 적용"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    
+    # 1) 구간별 최소/최대값 위치 사전 선택 (정렬 한 번으로 벡터화)
+    n_bins = min(n_out * minmax_ratio // 2, n // 2)
+    bins = np.arange(n) * n_bins // n
+    order = np.lexsort((y, bins))
+    _, first = np.unique(bins[order], return_index=True)
+    last = np.r_[first[1:], n] - 1
+    candidates = np.unique(np.r_[0, order[first], order[last], n - 1])
+    
+    # 2) 후보에 대해 LTTB
+    return candidates[_lttb(candidates, y[candidates], n_out)]
+
+def _frame_digest(df):
+    """DataFrame 캐시 키 - 셀 단위 해시 대신 Close/Volume/인덱스 버퍼 다이제스트"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(df[['Close', 'Volume']].to_numpy()).tobytes())
+    h.update(df.index.values.tobytes())
+    return h.hexdigest()
+
+def _build_metal_figures(data):
+    """개별 금속 가격/거래량 차트 생성"""
+    hist = data['etf_history']
+    info = data['info']
+    
+    close = hist['Close'].to_numpy()
+    ma20, ma50 = _moving_averages(close, (20, 50))
+    
+    # 화면에 필요한 만큼만 포인트 전송 (차트 전달용은 float32 / datetime64[ms])
+    sel = _downsample_indices(close)
+    x = hist.index.values[sel].astype('datetime64[ms]')
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scattergl(
+        x=x,
+        y=close[sel].astype(np.float32),
+        mode='lines',
+        name='종가',
+        line=dict(color=info['color'], width=2),
+        hovertemplate='<b>%{x|%Y-%m-%d}</b><br>종가: $%{y:.2f}<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Scattergl(
+        x=x,
+        y=ma20[sel].astype(np.float32),
+        mode='lines',
+        name='MA20',
+        line=dict(color='orange', width=1, dash='dash'),
+        opacity=0.7
+    ))
+    
+    fig.add_trace(go.Scattergl(
+        x=x,
+        y=ma50[sel].astype(np.float32),
+        mode='lines',
+        name='MA50',
+        line=dict(color='red', width=1, dash='dot'),
+        opacity=0.7
+    ))
+    
+    fig.update_layout(
+        title=f"{info['name']} ({info['ticker']}) ETF 가격 추이",
+        xaxis_title="날짜",
+        yaxis_title="가격 (USD)",
+        height=400,
+        hovermode='x unified',
+        showlegend=True
+    )
+    
+    # 거래량 (막대는 솎아내면 간격이 불규칙해지므로 전 구간 그대로 전송)
+    fig_vol = go.Figure()
+    fig_vol.add_trace(go.Bar(
+        x=hist.index.values.astype('datetime64[ms]'),
+        y=hist['Volume'].to_numpy(dtype=np.float64),
+        name='거래량',
+        marker_color=info['color'],
+        opacity=0.6
+    ))
+    
+    fig_vol.update_layout(
+        title="거래량",
+        height=200,
+        showlegend=False
+    )
+    
+    return fig, fig_vol
+
+def _build_comparison_figure(metal_data):
+    """통합 비교 차트 생성"""
+    fig_compare = go.Figure()
+    
+    # 공통 날짜 인덱스에 맞춘 (T, n_metals) 배열을 첫 유효값 기준으로 한 번에 정규화
+    idx = reduce(pd.Index.union, [data['etf_history'].index for data in metal_data.values()])
+    arr = np.stack([data['etf_history']['Close'].reindex(idx).ffill().to_numpy()
+                    for data in metal_data.values()], axis=1)
+    first = np.argmax(~np.isnan(arr), axis=0)
+    norm = (arr / arr[first, np.arange(arr.shape[1])] * 100).astype(np.float32)
+    x = idx.values.astype('datetime64[ms]')
+    
+    for i, data in enumerate(metal_data.values()):
+        info = data['info']
+        sel = first[i] + _downsample_indices(norm[first[i]:, i])
+        
+        fig_compare.add_trace(go.Scattergl(
+            x=x[sel],
+            y=norm[sel, i],
+            mode='lines',
+            name=info['name'],
+            line=dict(color=info['color'], width=2.5)
+        ))
+    
+    fig_compare.update_layout(
+        title="귀금속 ETF 상대 성과 비교 (시작점 = 100)",
+        height=500,
+        hovermode='x unified'
+    )
+    
+    return fig_compare
+
+@st.fragment
 def render_price_charts(metal_data):
-    """가격 차트 렌더링"""
+    """가격 차트 렌더링 (선택된 탭만 그리며, 탭 전환 시 이 영역만 재실행)"""
     st.subheader("📈 가격 추이 차트")
     
-    tabs = st.tabs([data['info']['name'] for data in metal_data.values()] + ["통합 비교"])
+    tabs = st.tabs([data['info']['name'] for data in metal_data.values()] + ["통합 비교"],
+                   key="price_chart_tabs", on_change="rerun")
     
-    for idx, (key, data) in enumerate(metal_data.items()):
-        with tabs[idx]:
-            hist = data['etf_history']
-            info = data['info']
-            
-            fig = go.Figure()
-            
-            fig.add_trace(go.Scatter(
-                x=hist.index,
-                y=hist['Close'],
-                mode='lines',
-                name='종가',
-                line=dict(color=info['color'], width=2),
-                hovertemplate='<b>%{x|%Y-%m-%d}</b><br>종가: $%{y:.2f}<extra></extra>'
-            ))
-            
-            ma20 = hist['Close'].rolling(window=20).mean()
-            ma50 = hist['Close'].rolling(window=50).mean()
-            
-            fig.add_trace(go.Scatter(
-                x=hist.index,
-                y=ma20,
-                mode='lines',
-                name='MA20',
-                line=dict(color='orange', width=1, dash='dash'),
-                opacity=0.7
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=hist.index,
-                y=ma50,
-                mode='lines',
-                name='MA50',
-                line=dict(color='red', width=1, dash='dot'),
-                opacity=0.7
-            ))
-            
-            fig.update_layout(
-                title=f"{info['name']} ({info['ticker']}) ETF 가격 추이",
-                xaxis_title="날짜",
-                yaxis_title="가격 (USD)",
-                height=400,
-                hovermode='x unified',
-                showlegend=True
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # 거래량
-            fig_vol = go.Figure()
-            fig_vol.add_trace(go.Bar(
-                x=hist.index,
-                y=hist['Volume'],
-                name='거래량',
-                marker_color=info['color'],
-                opacity=0.6
-            ))
-            
-            fig_vol.update_layout(
-                title="거래량",
-                height=200,
-                showlegend=False
-            )
-            
-            st.plotly_chart(fig_vol, use_container_width=True)
+    for tab, data in zip(tabs, metal_data.values()):
+        if tab.open:
+            fig, fig_vol = _build_metal_figures(data)
+            with tab:
+                st.plotly_chart(fig, width="stretch")
+                st.plotly_chart(fig_vol, width="stretch")
     
-    # 통합 비교
-    with tabs[-1]:
-        fig_compare = go.Figure()
-        
-        for key, data in metal_data.items():
-            hist = data['etf_history']
-            info = data['info']
-            normalized = (hist['Close'] / hist['Close'].iloc[0]) * 100
-            
-            fig_compare.add_trace(go.Scatter(
-                x=hist.index,
-                y=normalized,
-                mode='lines',
-                name=info['name'],
-                line=dict(color=info['color'], width=2.5)
-            ))
-        
-        fig_compare.update_layout(
-            title="귀금속 ETF 상대 성과 비교 (시작점 = 100)",
-            height=500,
-            hovermode='x unified'
-        )
-        
-        st.plotly_chart(fig_compare, use_container_width=True)
+    if tabs[-1].open:
+        with tabs[-1]:
+            st.plotly_chart(_build_comparison_figure(metal_data), width="stretch")
+
+def _ratio_strategy_equity(ratio, ret_gold, ret_silver, upper=85, lower=65):
+    """금은비율 전략 누적 수익 곡선 - 비율 > upper: 은 매수/금 매도, < lower: 금 매수/은 매도
+    
+    포지션은 당일 종가 기준 비율로 정하고 다음 거래일 수익률에 적용 (미래 정보 사용 없음).
+    upper/lower에 (k, 1) 배열을 넘기면 임계값 조합 k개를 한 번에 계산.
+    """
+    pos = np.where(ratio > upper, -1, np.where(ratio < lower, 1, 0))
+    growth = np.cumprod(1 + pos[..., :-1] * (ret_gold - ret_silver), axis=-1)
+    equity = np.concatenate((np.ones(growth.shape[:-1] + (1,)), growth), axis=-1)
+    return equity, pos
+
+@st.cache_data(ttl=300, hash_funcs={pd.DataFrame: _frame_digest})
+def _run_ratio_backtest(gold, silver):
+    """금은비율 전략 백테스트 - 비율은 선물, 수익률은 ETF 종가 기준"""
+    frame = pd.concat([
+        gold['futures_history']['Close'], silver['futures_history']['Close'],
+        gold['etf_history']['Close'], silver['etf_history']['Close']
+    ], axis=1, keys=['gold_f', 'silver_f', 'gold', 'silver']).ffill().dropna()
+    
+    if len(frame) < 2:
+        return None
+    
+    arr = frame.to_numpy(dtype=np.float64)
+    ratio = arr[:, 0] / arr[:, 1]
+    rets = np.diff(arr[:, 2:], axis=0) / arr[:-1, 2:]
+    equity, pos = _ratio_strategy_equity(ratio, rets[:, 0], rets[:, 1])
+    
+    return {
+        'x': frame.index.values.astype('datetime64[ms]'),
+        'equity': equity,
+        'gold_hold': arr[:, 2] / arr[0, 2],
+        'silver_hold': arr[:, 3] / arr[0, 3],
+        'max_drawdown': float((equity / np.maximum.accumulate(equity) - 1).min() * 100),
+        'exposure': float(np.count_nonzero(pos[:-1]) / len(pos[:-1]) * 100)
+    }
 
 def render_backtest_section(metal_data):
     """백테스트"""
@@ -487,7 +767,38 @@ def render_backtest_section(metal_data):
         st.warning("금과 은 데이터 필요")
         return
     
-    # 간단한 백테스트 로직 (이전과 동일)
+    result = _run_ratio_backtest(metal_data['gold'], metal_data['silver'])
+    if result is None:
+        st.warning("백테스트에 필요한 데이터 부족")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("전략 수익률", f"{(result['equity'][-1] - 1) * 100:+.2f}%")
+    col2.metric("금 보유", f"{(result['gold_hold'][-1] - 1) * 100:+.2f}%")
+    col3.metric("은 보유", f"{(result['silver_hold'][-1] - 1) * 100:+.2f}%")
+    col4.metric("최대 낙폭", f"{result['max_drawdown']:.2f}%", f"포지션 보유 {result['exposure']:.0f}%", delta_color="off")
+    
+    fig = go.Figure()
+    for name, y, color in [
+        ('금은비율 전략', result['equity'], '#1f77b4'),
+        (metal_data['gold']['info']['name'], result['gold_hold'], metal_data['gold']['info']['color']),
+        (metal_data['silver']['info']['name'], result['silver_hold'], metal_data['silver']['info']['color'])
+    ]:
+        fig.add_trace(go.Scattergl(
+            x=result['x'],
+            y=(y * 100).astype(np.float32),
+            mode='lines',
+            name=name,
+            line=dict(color=color, width=2.5 if name == '금은비율 전략' else 1.5)
+        ))
+    
+    fig.update_layout(
+        title="금은비율 전략 vs 단순 보유 (시작점 = 100)",
+        height=400,
+        hovermode='x unified'
+    )
+    
+    st.plotly_chart(fig, width="stretch")
     st.caption("⚠️ 과거 성과는 미래를 보장하지 않습니다.")
 
 def render_strategy_summary(signals, metal_data):
@@ -530,7 +841,18 @@ def render_strategy_summary(signals, metal_data):
 # 메인 함수
 # ============================================================================
 
+# 통합 신호 구간 (평균 점수 기준, 경계값은 위 구간에 포함)
+_TOTAL_THRESHOLDS = np.array([2.0, 2.5, 3.5, 4.5])
+_TOTAL_SIGNALS = [
+    ("🔴🔴 강력 매도", "signal-strong-sell"),
+    ("🔴 매도", "signal-sell"),
+    ("🟡 중립", "signal-neutral"),
+    ("🟢 매수", "signal-buy"),
+    ("🟢🟢 강력 매수", "signal-strong-buy")
+]
+
 def main():
+    st.markdown(_CSS, unsafe_allow_html=True)
     st.markdown('<h1 class="main-header">🥇 귀금속 ETF 트레이딩 신호 대시보드</h1>', unsafe_allow_html=True)
     
     with st.sidebar:
@@ -547,42 +869,43 @@ def main():
         show_backtest = st.checkbox("백테스트", value=False)
         
         if st.button("🔄 새로고침"):
+            clear_today_cache()
             st.cache_data.clear()
             st.rerun()
     
+    # 네트워크/yfinance 오류만 처리 (예외는 캐시되지 않으므로 다음 실행에서 다시 요청)
     with st.spinner("데이터 로딩..."):
-        metal_data = fetch_etf_data(lookback_days)
-        supporting_data = fetch_supporting_data()
+        try:
+            metal_data = fetch_etf_data(lookback_days)
+            supporting_data = fetch_supporting_data(lookback_days)
+        except (OSError, YFException) as e:
+            st.error(f"데이터 로드 실패: {e}")
+            return
+    
+    # 캐시 함수 안에서는 요소를 만들지 않고 (캐시 재생 충돌 방지), 누락 항목은 여기서 알림
+    for key, info in METAL_ETFS.items():
+        if key not in metal_data:
+            st.toast(f"⚠️ {info['name']} 데이터 없음 (재시도 후에도 Yahoo 응답이 비어 있음)")
+    for key, info in SUPPORTING_INDICES.items():
+        if key not in supporting_data.index:
+            st.toast(f"⚠️ {info['name']} 데이터 없음 (재시도 후에도 Yahoo 응답이 비어 있음)")
     
     if not metal_data:
         st.error("데이터 로드 실패")
         return
     
-    signals = generate_trading_signals(metal_data, supporting_data)
+    signals = load_signals(lookback_days)
     
     # 메인 신호
     st.subheader("🚦 통합 신호")
     
-    total_score = sum([s['score'] for s in signals.values() if 'score' in s])
-    avg_score = total_score / len([s for s in signals.values() if 'score' in s]) if signals else 3
-    
-    if avg_score >= 4.5:
-        signal_text = "🟢🟢 강력 매수"
-        sig_class = "signal-strong-buy"
-    elif avg_score >= 3.5:
-        signal_text = "🟢 매수"
-        sig_class = "signal-buy"
-    elif avg_score >= 2.5:
-        signal_text = "🟡 중립"
-        sig_class = "signal-neutral"
-    elif avg_score >= 2.0:
-        signal_text = "🔴 매도"
-        sig_class = "signal-sell"
-    else:
-        signal_text = "🔴🔴 강력 매도"
-        sig_class = "signal-strong-sell"
+    scores = np.fromiter((s['score'] for s in signals.values() if 'score' in s), dtype=np.int8)
+    avg_score = float(scores.mean()) if scores.size else 3.0
+    score_std = float(scores.std()) if scores.size else 0.0
+    
+    signal_text, sig_class = _TOTAL_SIGNALS[int(np.searchsorted(_TOTAL_THRESHOLDS, avg_score, side='right'))]
     
-    st.markdown(f'<div class="{sig_class}">{signal_text}<br>점수: {avg_score:.2f}/5.0</div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="{sig_class}">{signal_text}<br>점수: {avg_score:.2f}/5.0 (±{score_std:.2f})</div>', unsafe_allow_html=True)
     
     st.divider()
     
@@ -607,13 +930,10 @@ def main():
                 else:
                     sig_class = "signal-neutral"
                 
-                st.markdown(f"""
-                <div class="{sig_class}">
-                    <div style="font-size: 1.3rem;">{info['name']}</div>
-                    <div style="font-size: 1.1rem; margin: 0.5rem 0;">{sig['signal']}</div>
-                    <div style="font-size: 0.85rem;">{sig['description']}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_METAL_CARD_HTML.format(
+                    sig_class=sig_class, name=info['name'],
+                    signal=sig['signal'], description=sig['description']
+                ), unsafe_allow_html=True)
                 
                 st.metric(info['ticker'], f"${data['etf_current']:.2f}", f"{sig['day_change']:+.2f}%")
     
@@ -626,44 +946,36 @@ def main():
         
         with col1:
             gs = signals['gold_silver_ratio']
-            st.markdown(f"""
-            <div class="signal-neutral">
-                <h4>💰 금/은 비율</h4>
-                <div style="font-size: 2rem;">{gs['ratio']:.1f}</div>
-                <div>{gs['signal']}</div>
-                <div style="font-size: 0.85rem; margin-top: 1rem;">{gs['description']}</div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_RATIO_CARD_HTML.format(
+                title='💰 금/은 비율', ratio=f"{gs['ratio']:.1f}",
+                signal=gs['signal'], description=gs['description']
+            ), unsafe_allow_html=True)
         
         with col2:
             if 'copper_gold_ratio' in signals:
                 cg = signals['copper_gold_ratio']
-                st.markdown(f"""
-                <div class="signal-neutral">
-                    <h4>🌡️ 구리/금 비율</h4>
-                    <div style="font-size: 2rem;">{cg['ratio']:.2f}</div>
-                    <div>{cg['signal']}</div>
-                    <div style="font-size: 0.85rem; margin-top: 1rem;">{cg['description']}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_RATIO_CARD_HTML.format(
+                    title='🌡️ 구리/금 비율', ratio=f"{cg['ratio']:.2f}",
+                    signal=cg['signal'], description=cg['description']
+                ), unsafe_allow_html=True)
         
         st.divider()
     
     # 거시경제
-    if 'macro_environment' in signals and supporting_data:
+    if 'macro_environment' in signals and not supporting_data.empty:
         st.subheader("🌍 거시경제")
         macro = signals['macro_environment']
         st.info(f"{macro['signal']}: {macro['description']}")
         
         col1, col2, col3, col4 = st.columns(4)
-        if 'dxy' in supporting_data:
+        if 'dxy' in supporting_data.index:
             with col1:
-                st.metric("달러지수", f"{supporting_data['dxy']['current']:.2f}", 
-                         f"{supporting_data['dxy']['change_pct']:+.2f}%")
-        if 'vix' in supporting_data:
+                st.metric("달러지수", f"{supporting_data.loc['dxy', 'current']:.2f}", 
+                         f"{supporting_data.loc['dxy', 'change_pct']:+.2f}%")
+        if 'vix' in supporting_data.index:
             with col4:
-                st.metric("VIX", f"{supporting_data['vix']['current']:.1f}",
-                         f"{supporting_data['vix']['change_pct']:+.2f}%")
+                st.metric("VIX", f"{supporting_data.loc['vix', 'current']:.1f}",
+                         f"{supporting_data.loc['vix', 'change_pct']:+.2f}%")
         
         st.divider()
     